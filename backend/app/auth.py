@@ -1,26 +1,66 @@
 # backend/app/auth.py
+import asyncio
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional
 import jwt
 from passlib.context import CryptContext
 
 JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret-change-me")
 ALGO = "HS256"
 
+# Raising AUTH_PBKDF2_ROUNDS upgrades existing hashes transparently on their next login
+PBKDF2_ROUNDS = int(os.getenv("AUTH_PBKDF2_ROUNDS", "0")) or None
+
 # Use PBKDF2-SHA256 instead of bcrypt (no 72-byte cap, pure-Python)
 pwd_context = CryptContext(
     schemes=["pbkdf2_sha256"],
     deprecated="auto",
-    # You can tune rounds if you like, default ~29000 in passlib; higher is slower but stronger
-    # pbkdf2_sha256__rounds=320000,  # optional
+    # default ~29000 in passlib; higher is slower but stronger. min_rounds flags older, weaker hashes for rehash
+    **({"pbkdf2_sha256__default_rounds": PBKDF2_ROUNDS, "pbkdf2_sha256__min_rounds": PBKDF2_ROUNDS}
+       if PBKDF2_ROUNDS else {}),
 )
 
+# Hashing runs on its own small pool so a login burst can use at most HASH_WORKERS cores,
+# and requests beyond HASH_MAX_PENDING are rejected instead of queueing without bound.
+HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+HASH_MAX_PENDING = int(os.getenv("AUTH_HASH_MAX_PENDING", "32"))
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="pwd-hash")
+_hash_slots = threading.BoundedSemaphore(HASH_MAX_PENDING)
+
+class HashPoolBusy(Exception):
+    """Too many password hash/verify operations already queued."""
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
+async def _run_hash(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise HashPoolBusy()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, fn, *args)
+    finally:
+        _hash_slots.release()
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hash(pwd_context.hash, password)
+
+async def verify_and_update_async(password: str, password_hash: Optional[str]) -> tuple[bool, Optional[str]]:
+    """
+    Returns (ok, new_hash). new_hash is set when the stored hash uses outdated settings
+    (e.g. fewer rounds than AUTH_PBKDF2_ROUNDS) and should replace it.
+    With no stored hash a dummy verify runs, so unknown emails take as long as known ones.
+    """
+    if password_hash is None:
+        await _run_hash(pwd_context.dummy_verify)
+        return False, None
+    return await _run_hash(pwd_context.verify_and_update, password, password_hash)
+
 def create_token(subject: str, expires_minutes: int = 60*24) -> str:
     payload = {"sub": subject, "exp": datetime.utcnow() + timedelta(minutes=expires_minutes)}
     return jwt.encode(payload, JWT_SECRET, algorithm=ALGO)
@@ -4,6 +4,7 @@ from datetime import datetime
 
 from dotenv import load_dotenv
 from sqlmodel import SQLModel, Field, Session, create_engine
+from sqlalchemy import inspect, text, func, or_, and_
 
 load_dotenv()  # loads DATABASE_URL, etc.
 
@@ -39,10 +40,75 @@ class Report(SQLModel, table=True):
     result_label: str
     probability: float
     report_path: str
+    model_version: Optional[str] = None  # "<name>:<version>" from the model registry
+    tta_views: Optional[int] = None      # set when the probability is a test-time-augmentation average
+    uncertainty: Optional[float] = None  # variance of that probability across the TTA views
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+# Columns added after the first release; create_all() does not ALTER existing tables.
+_ADDED_COLUMNS = {
+    "report": {"model_version": "VARCHAR", "tta_views": "INTEGER", "uncertainty": "FLOAT"},
+}
+
+def _add_missing_columns():
+    insp = inspect(engine)
+    for table, cols in _ADDED_COLUMNS.items():
+        if not insp.has_table(table):
+            continue
+        existing = {c["name"] for c in insp.get_columns(table)}
+        with engine.begin() as conn:
+            for name, ddl in cols.items():
+                if name not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+# Search indexes that SQLModel fields cannot express (expression / operator-class indexes).
+_PG_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_patient_mrn_prefix ON patient (mrn text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_patient_first_name_prefix ON patient (lower(first_name) text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_patient_last_name_prefix ON patient (lower(last_name) text_pattern_ops)",
+]
+_SQLITE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_patient_first_name_lower ON patient (lower(first_name))",
+    "CREATE INDEX IF NOT EXISTS ix_patient_last_name_lower ON patient (lower(last_name))",
+]
+
+def _ensure_search_indexes():
+    if engine.dialect.name == "postgresql":
+        stmts = _PG_INDEXES
+    elif engine.dialect.name == "sqlite":
+        stmts = _SQLITE_INDEXES
+    else:
+        return
+    with engine.begin() as conn:
+        for stmt in stmts:
+            conn.execute(text(stmt))
+
+def _prefix(col, value: str):
+    """`col` starts with `value`, written so the dialect's index above can serve it."""
+    if engine.dialect.name == "postgresql":
+        return col.startswith(value, autoescape=True)  # LIKE 'v%' → text_pattern_ops index
+    return and_(col >= value, col < value + "\uffff")  # range scan (SQLite binary collation)
+
+def patient_search_clause(q: str):
+    """
+    WHERE clause for the patient search box (prefix matching on every database):
+    - one term  ("smi")      → MRN prefix OR first-name prefix OR last-name prefix (names case-insensitive)
+    - two terms ("john sm")  → first-name prefix AND last-name prefix
+    Case folding is the database's lower(): Postgres folds Unicode, SQLite only folds ASCII,
+    so on SQLite "émile" does not match "Émile".
+    """
+    q = q.strip()
+    terms = q.lower().split()
+    first_name, last_name = func.lower(Patient.first_name), func.lower(Patient.last_name)
+    if len(terms) >= 2:
+        return and_(_prefix(first_name, terms[0]), _prefix(last_name, " ".join(terms[1:])))
+    ql = terms[0] if terms else ""
+    return or_(_prefix(Patient.mrn, q), _prefix(first_name, ql), _prefix(last_name, ql))
+
 def init_db():
     SQLModel.metadata.create_all(engine)
+    _add_missing_columns()
+    _ensure_search_indexes()
 
 def get_session():
     return Session(engine)
@@ -0,0 +1,274 @@
+"""
+Evaluate the served model (load_keras_model + preprocess_for_model) on a labeled image folder.
+
+    cd backend
+    python -m app.evaluate --data ../Brain_Tumor_Detection --out eval_report.json [--model path.h5]
+        [--store .eval_cache/bt_store]   # score from a memory-mapped crop store (app.vision.tensor_store)
+
+The folder needs `yes/` (tumor) and `no/` (no tumor) subdirectories.
+Per-image probabilities are cached per model hash, so a rerun only scores new or changed images.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+import numpy as np
+from PIL import Image
+
+from .model_tf import load_keras_model
+from .vision import preprocess as vp
+from .vision import tensor_store as ts
+from .vision.tensor_store import TensorStore, IMAGE_EXTS, file_hash
+LABEL_DIRS = {"yes": 1, "no": 0}
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", ".eval_cache")
+THRESHOLDS = np.round(np.arange(0.05, 1.0, 0.05), 2)
+
+
+# ---------- dataset ----------
+def list_dataset(root: str) -> tuple[list[str], np.ndarray]:
+    paths, labels = [], []
+    for sub, y in LABEL_DIRS.items():
+        d = os.path.join(root, sub)
+        if not os.path.isdir(d):
+            continue
+        for name in sorted(os.listdir(d)):
+            if name.lower().endswith(IMAGE_EXTS):
+                paths.append(os.path.abspath(os.path.join(d, name)))
+                labels.append(y)
+    return paths, np.asarray(labels, dtype=np.int8)
+
+def model_hash(model_path: Optional[str], model, classes: list[str]) -> str:
+    """Weights file hash + class order (decides which column is P(tumor)) + preprocessing settings."""
+    h = hashlib.sha1()
+    if model_path and os.path.exists(model_path):
+        h.update(file_hash(model_path).encode())
+    else:
+        h.update(b"build_same_architecture")
+    h.update(repr((
+        tuple(classes), vp.infer_input_size(model), vp.USE_EXTERNAL_PREPROCESS, vp.CROP_ADD_PIXELS,
+        ts.PREPROCESS_VERSION,
+    )).encode())
+    return h.hexdigest()[:16]
+
+
+# ---------- cache ----------
+def _cache_path(mhash: str) -> str:
+    return os.path.join(CACHE_DIR, f"preds_{mhash}.json")
+
+def load_cache(mhash: str) -> dict[str, float]:
+    try:
+        with open(_cache_path(mhash)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_cache(mhash: str, cache: dict[str, float]) -> None:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = _cache_path(mhash) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, _cache_path(mhash))
+
+
+# ---------- inference ----------
+def positive_prob(preds: np.ndarray, classes: list[str]) -> np.ndarray:
+    """
+    (N, 1) sigmoid or (N, C) softmax → (N,) probability of 'tumor'.
+    Multiclass: the 'tumor' column if present, else 1 - P('no_tumor') (e.g. glioma/meningioma/pituitary).
+    """
+    preds = np.asarray(preds, dtype=np.float64)
+    if preds.shape[-1] == 1:
+        return preds[:, 0]
+    if "tumor" in classes:
+        return preds[:, classes.index("tumor")]
+    if "no_tumor" in classes:
+        return 1.0 - preds[:, classes.index("no_tumor")]
+    raise ValueError(f"classes {classes} have neither 'tumor' nor 'no_tumor'; cannot score tumor vs no tumor")
+
+def _load_one(path: str, model) -> np.ndarray:
+    with Image.open(path) as im:
+        return vp.preprocess_for_model(im, model)
+
+def _load_batch(paths: list[str], model) -> np.ndarray:
+    return np.concatenate([_load_one(p, model) for p in paths], axis=0)
+
+def iter_batches(paths: list[str], model, batch_size: int, workers: int = 4) -> Iterator[tuple[int, np.ndarray]]:
+    """
+    Yields (start_index, (B, H, W, 3) batch). JPEG decode + crop run on a thread pool
+    one batch ahead, so the CPU prepares batch i+1 while the model scores batch i.
+    """
+    starts = range(0, len(paths), batch_size)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def _submit(s):
+            chunk = paths[s:s + batch_size]
+            # split the batch across workers; each returns its own slice
+            step = max(1, -(-len(chunk) // workers))
+            return [pool.submit(_load_batch, chunk[i:i + step], model) for i in range(0, len(chunk), step)]
+
+        pending = None
+        for s in starts:
+            nxt = _submit(s)
+            if pending is not None:
+                yield pending[0], np.concatenate([f.result() for f in pending[1]], axis=0)
+            pending = (s, nxt)
+        if pending is not None:
+            yield pending[0], np.concatenate([f.result() for f in pending[1]], axis=0)
+
+def score_paths(model, paths: list[str], classes: list[str], batch_size: int = 32) -> np.ndarray:
+    probs = np.empty(len(paths), dtype=np.float64)
+    for start, x in iter_batches(paths, model, batch_size):
+        preds = model.predict(x, batch_size=len(x), verbose=0)
+        probs[start:start + len(x)] = positive_prob(preds, classes)
+    return probs
+
+def score_store(model, store: TensorStore, rows: list[int], classes: list[str], batch_size: int = 32) -> np.ndarray:
+    """Same as score_paths, but batches come pre-cropped from the memory-mapped store."""
+    probs = np.empty(len(rows), dtype=np.float64)
+    if rows == list(range(len(store))):
+        rows = None  # whole store in order: contiguous mmap slices instead of a gather per batch
+    for start, x in store.batches(rows, batch_size):
+        preds = model.predict(x, batch_size=len(x), verbose=0)
+        probs[start:start + len(x)] = positive_prob(preds, classes)
+    return probs
+
+
+# ---------- metrics (vectorized) ----------
+def _ranks(x: np.ndarray) -> np.ndarray:
+    """1-based ranks with ties averaged."""
+    _, inv, counts = np.unique(x, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    avg = ends - (counts - 1) / 2.0
+    return avg[inv]
+
+def roc_auc(y: np.ndarray, p: np.ndarray) -> Optional[float]:
+    """Mann-Whitney U formulation of ROC AUC."""
+    n_pos = int(y.sum()); n_neg = len(y) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return None
+    r = _ranks(p)
+    return float((r[y == 1].sum() - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg))
+
+def confusion(y: np.ndarray, yhat: np.ndarray) -> dict:
+    cm = np.bincount(2 * y.astype(np.int64) + yhat.astype(np.int64), minlength=4)
+    return {"tn": int(cm[0]), "fp": int(cm[1]), "fn": int(cm[2]), "tp": int(cm[3])}
+
+def calibration(y: np.ndarray, p: np.ndarray, n_bins: int = 10) -> dict:
+    """Expected calibration error + reliability bins on P(tumor)."""
+    bins = np.minimum((p * n_bins).astype(np.int64), n_bins - 1)
+    count = np.bincount(bins, minlength=n_bins)
+    conf_sum = np.bincount(bins, weights=p, minlength=n_bins)
+    pos_sum = np.bincount(bins, weights=y, minlength=n_bins)
+    nz = count > 0
+    conf = np.divide(conf_sum, count, out=np.zeros(n_bins), where=nz)
+    freq = np.divide(pos_sum, count, out=np.zeros(n_bins), where=nz)
+    ece = float(np.sum(count * np.abs(conf - freq)) / max(1, len(p)))
+    return {
+        "ece": ece,
+        "bins": [
+            {"lo": i / n_bins, "hi": (i + 1) / n_bins, "count": int(count[i]),
+             "mean_prob": float(conf[i]), "frac_positive": float(freq[i])}
+            for i in range(n_bins) if nz[i]
+        ],
+    }
+
+def threshold_sweep(y: np.ndarray, p: np.ndarray, thresholds: np.ndarray = THRESHOLDS) -> list[dict]:
+    """All thresholds at once: (T, N) prediction matrix → per-threshold rates."""
+    yhat = p[None, :] >= thresholds[:, None]
+    pos = y.astype(bool)[None, :]
+    tp = np.sum(yhat & pos, axis=1); fp = np.sum(yhat & ~pos, axis=1)
+    fn = np.sum(~yhat & pos, axis=1); tn = np.sum(~yhat & ~pos, axis=1)
+    sens = tp / np.maximum(1, tp + fn)
+    spec = tn / np.maximum(1, tn + fp)
+    prec = tp / np.maximum(1, tp + fp)
+    acc = (tp + tn) / max(1, len(y))
+    f1 = 2 * prec * sens / np.maximum(1e-12, prec + sens)
+    return [
+        {"threshold": float(t), "accuracy": float(a), "sensitivity": float(se),
+         "specificity": float(sp), "precision": float(pr), "f1": float(f)}
+        for t, a, se, sp, pr, f in zip(thresholds, acc, sens, spec, prec, f1)
+    ]
+
+def compute_metrics(y: np.ndarray, p: np.ndarray, threshold: float = 0.5) -> dict:
+    yhat = (p >= threshold).astype(np.int8)
+    return {
+        "n": int(len(y)),
+        "positives": int(y.sum()),
+        "accuracy": float(np.mean(yhat == y)) if len(y) else None,
+        "auc": roc_auc(y, p),
+        "confusion_matrix": confusion(y, yhat),
+        "calibration": calibration(y, p),
+        "threshold_sweep": threshold_sweep(y, p),
+    }
+
+
+# ---------- command ----------
+def evaluate(
+    data_dir: str,
+    model_path: Optional[str],
+    classes: list[str],
+    batch_size: int = 32,
+    store_prefix: Optional[str] = None,
+) -> dict:
+    t0 = time.perf_counter()
+    model = load_keras_model(model_path)
+    mhash = model_hash(model_path, model, classes)
+    paths, y = list_dataset(data_dir)
+
+    store = None
+    if store_prefix:
+        # refreshes only new/changed images; the index already holds each file's sha1
+        store = TensorStore.sync(data_dir, store_prefix, vp.infer_input_size(model))
+        hashes = [store.entries[store.row_of[p]]["sha1"] for p in paths]
+    else:
+        hashes = [file_hash(p) for p in paths]
+
+    cache = load_cache(mhash)
+    todo = [i for i, h in enumerate(hashes) if h not in cache]
+    if todo:
+        if store is not None:
+            probs = score_store(model, store, [store.row_of[paths[i]] for i in todo], classes, batch_size)
+        else:
+            probs = score_paths(model, [paths[i] for i in todo], classes, batch_size)
+        for i, pr in zip(todo, probs):
+            cache[hashes[i]] = float(pr)
+        save_cache(mhash, cache)
+    p = np.asarray([cache[h] for h in hashes], dtype=np.float64)
+
+    return {
+        "model_path": model_path,
+        "model_hash": mhash,
+        "data_dir": os.path.abspath(data_dir),
+        "scored": len(todo),
+        "cached": len(paths) - len(todo),
+        "seconds": round(time.perf_counter() - t0, 2),
+        "metrics": compute_metrics(y, p),
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--data", default=os.path.join(os.path.dirname(__file__), "..", "..", "Brain_Tumor_Detection"))
+    ap.add_argument("--model", default=os.getenv("MODEL_PATH"))
+    ap.add_argument("--classes", default=os.getenv("CLASSES", "no_tumor,tumor"))
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--store", default=None, help="memory-mapped crop store prefix (built/refreshed automatically)")
+    ap.add_argument("--out", default=None, help="write the JSON report here (default: stdout)")
+    args = ap.parse_args()
+
+    classes = [s.strip() for s in args.classes.split(",")]
+    report = evaluate(args.data, args.model, classes, args.batch_size, args.store)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+        m = report["metrics"]
+        print(f"[Eval] n={m['n']} acc={m['accuracy']:.4f} auc={m['auc']} ece={m['calibration']['ece']:.4f} "
+              f"(scored {report['scored']}, cached {report['cached']}) → {args.out}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,35 @@ import os
 from typing import List, Optional
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, File, Form, Depends, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from PIL import Image
 from sqlmodel import select, Session
 
-from .database import init_db, get_session, Doctor, Patient, Report
-from .schemas import DoctorCreate, DoctorLogin, PatientCreate, PatientUpdate
-from .auth import hash_password, verify_password, create_token, decode_token
-from .model_tf import load_keras_model, predict
+from .database import init_db, get_session, patient_search_clause, Doctor, Patient, Report
+from .schemas import DoctorCreate, DoctorLogin, PatientCreate, PatientUpdate, ModelLoad
+from .auth import (
+    create_token, decode_token, hash_password_async, verify_and_update_async, HashPoolBusy,
+)
+from .ratelimit import TokenBucketLimiter
+from .model_tf import decode_predictions
+from .model_registry import ModelRegistry
+from .maintenance import MaintenanceWorker, artifact_paths
 from .report_pdf import generate_report
 from sqlalchemy import func
 from datetime import datetime, timezone
 from typing import Optional, List
 from fastapi import Header, Query
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, delete
+from sqlalchemy.exc import IntegrityError
+import json
 from fastapi import HTTPException, Depends, Response
 
 from app.vision.preprocess import preprocess_for_model, infer_input_size
 from app.vision.gradcam import gradcam_heatmap, save_overlay, ensure_built
+from app.vision.tta import predict_tta, MAX_VIEWS
 
 
 load_dotenv()  # read .env
@@ -34,17 +43,28 @@ MODEL_PATH = os.getenv("MODEL_PATH", os.path.join(os.path.dirname(__file__), "mo
 # Ensure numpy is available for argmax used during inference and provide default class names.
 import numpy as np
 CLASSES = [s.strip() for s in os.getenv("CLASSES", "no_tumor,tumor").split(",")]
+MODEL_NAME = os.getenv("MODEL_NAME", "resnet50_binary")
+MODEL_VERSION = os.getenv("MODEL_VERSION")  # defaults to the weights file stem
+# Hot-swapped weights must live here; loading a Keras file can execute code embedded in it
+MODELS_DIR = os.path.realpath(os.getenv("MODELS_DIR", os.path.join(os.path.dirname(__file__), "models")))
+# Only these doctors may load / promote / shadow models (empty → nobody)
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
 
 app = FastAPI(title="MedVision API (TF/Keras + Postgres)", version="1.0.0")
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
-# init DB + load model once
+# init DB + load the default model once; later versions are hot-swapped via /models
 init_db()
-model = load_keras_model(MODEL_PATH)
+registry = ModelRegistry(default_name=MODEL_NAME)
+registry.load_sync(MODEL_NAME, MODEL_PATH, CLASSES, version=MODEL_VERSION)
+# file deletion, orphan sweeps and retention run off the request path
+maintenance = MaintenanceWorker(UPLOAD_DIR, REPORT_DIR)
+maintenance.start()
 
 def get_current_doctor(
     authorization: Optional[str] = Header(None),
@@ -60,44 +80,189 @@ def get_current_doctor(
         raise HTTPException(status_code=401, detail="Doctor not found")
     return doc
 
+def get_current_admin(doctor: Doctor = Depends(get_current_doctor)) -> Doctor:
+    if doctor.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return doctor
+
 @app.get("/health")
 def health():
     return {"ok": True}
 
 # ---------- Auth ----------
-@app.post("/auth/register")
-def register(doctor: DoctorCreate):
+# Token buckets in front of password hashing: burst size + sustained attempts per minute.
+# The per-IP bucket is sized for a whole clinic behind one NAT/proxy logging in at shift change;
+# the per-email bucket is what actually stops guessing against one account. It is only charged
+# for wrong passwords, so successful logins and requests already turned away never use it up.
+ip_limiter = TokenBucketLimiter(
+    capacity=int(os.getenv("AUTH_RATE_IP_BURST", "200")),
+    rate=int(os.getenv("AUTH_RATE_IP_PER_MIN", "300")) / 60.0,
+)
+email_limiter = TokenBucketLimiter(
+    capacity=int(os.getenv("AUTH_RATE_EMAIL_BURST", "5")),
+    rate=int(os.getenv("AUTH_RATE_EMAIL_PER_MIN", "5")) / 60.0,
+)
+# Number of reverse proxies in front of the API that append to X-Forwarded-For (0 = use the socket peer)
+TRUSTED_PROXY_HOPS = int(os.getenv("AUTH_TRUSTED_PROXY_HOPS", "0"))
+
+def _client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else "unknown"
+    if TRUSTED_PROXY_HOPS <= 0:
+        return peer
+    xff = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+    if not xff:
+        return peer
+    # entries left of what our own proxies appended are client-controlled, so count from the right
+    return xff[-TRUSTED_PROXY_HOPS] if len(xff) >= TRUSTED_PROXY_HOPS else xff[0]
+
+def _email_key(email: str) -> str:
+    return f"email:{email.lower()}"
+
+def _rate_limit(request: Request, email: Optional[str] = None) -> None:
+    """Charge the caller's IP; with `email`, also refuse if that account's failure budget is spent."""
+    wait = ip_limiter.hit(f"ip:{_client_ip(request)}")
+    if not wait and email:
+        wait = email_limiter.peek(_email_key(email))
+    if wait:
+        raise HTTPException(status_code=429, detail="Too many attempts, try again later",
+                            headers={"Retry-After": str(int(wait) + 1)})
+
+def _hash_busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Authentication busy, try again", headers={"Retry-After": "1"})
+
+# Sync DB helpers for the async auth handlers; called through run_in_threadpool so they never block the loop
+def _doctor_by_email(email: str) -> Optional[Doctor]:
     with get_session() as session:
-        if session.exec(select(Doctor).where(Doctor.email == doctor.email)).first():
-            raise HTTPException(status_code=400, detail="Email already registered")
-        doc = Doctor(email=doctor.email, full_name=doctor.full_name, password_hash=hash_password(doctor.password))
-        session.add(doc); session.commit(); session.refresh(doc)
-        return {"ok": True, "id": doc.id}
+        return session.exec(select(Doctor).where(Doctor.email == email)).first()
 
-@app.post("/auth/login")
-def login(creds: DoctorLogin):
+def _insert_doctor(email: str, full_name: str, password_hash: str) -> Optional[int]:
+    """Returns the new id, or None if the email was registered concurrently."""
+    with get_session() as session:
+        doc = Doctor(email=email, full_name=full_name, password_hash=password_hash)
+        session.add(doc)
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return None
+        session.refresh(doc)
+        return doc.id
+
+def _update_password_hash(doctor_id: int, password_hash: str) -> None:
     with get_session() as session:
-        doc = session.exec(select(Doctor).where(Doctor.email == creds.email)).first()
-        if not doc or not verify_password(creds.password, doc.password_hash):
-            raise HTTPException(status_code=401, detail="Invalid credentials")
-        token = create_token(doc.email)
-        return {"token": token, "doctor": {"id": doc.id, "full_name": doc.full_name, "email": doc.email}}
+        doc = session.get(Doctor, doctor_id)
+        if doc:
+            doc.password_hash = password_hash
+            session.add(doc); session.commit()
+
+@app.post("/auth/register")
+async def register(doctor: DoctorCreate, request: Request):
+    _rate_limit(request)
+    if await run_in_threadpool(_doctor_by_email, doctor.email):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    try:
+        password_hash = await hash_password_async(doctor.password)  # off the event loop, bounded pool
+    except HashPoolBusy:
+        raise _hash_busy()
+    doc_id = await run_in_threadpool(_insert_doctor, doctor.email, doctor.full_name, password_hash)
+    if doc_id is None:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    return {"ok": True, "id": doc_id}
+
+@app.post("/auth/login")
+async def login(creds: DoctorLogin, request: Request):
+    _rate_limit(request, creds.email)
+    doc = await run_in_threadpool(_doctor_by_email, creds.email)
+    try:
+        ok, new_hash = await verify_and_update_async(creds.password, doc.password_hash if doc else None)
+    except HashPoolBusy:
+        raise _hash_busy()
+    if not ok:
+        email_limiter.hit(_email_key(creds.email))
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # stored hash used older settings (e.g. fewer rounds) — upgrade it now that we know the password
+        await run_in_threadpool(_update_password_hash, doc.id, new_hash)
+    token = create_token(doc.email)
+    return {"token": token, "doctor": {"id": doc.id, "full_name": doc.full_name, "email": doc.email}}
 
 # ---------- Patients ----------
 @app.post("/patients")
 def create_patient(p: PatientCreate, doctor: Doctor = Depends(get_current_doctor)):
     with get_session() as session:
-        if session.exec(select(Patient).where(Patient.mrn == p.mrn)).first():
-            raise HTTPException(status_code=400, detail="MRN already exists")
         patient = Patient(**p.model_dump())
-        session.add(patient); session.commit(); session.refresh(patient)
+        session.add(patient)
+        try:
+            session.commit()  # unique index on mrn rejects duplicates; no pre-select round trip
+        except IntegrityError:
+            session.rollback()
+            raise HTTPException(status_code=400, detail="MRN already exists")
+        session.refresh(patient)
         return {"id": patient.id}
 
+PATIENT_FIELDS = ["id", "first_name", "last_name", "dob", "mrn", "notes", "created_at"]
+PATIENT_LIST_FIELDS = ["id", "first_name", "last_name", "dob", "mrn"]  # list view does not ship notes
+PATIENT_PAGE_SIZE = 100  # default /patients page; clients follow X-Next-Cursor
+EXPORT_BATCH = 500
+
+def _patient_columns(fields: Optional[str]) -> list[str]:
+    if not fields:
+        return PATIENT_LIST_FIELDS
+    cols = [f.strip() for f in fields.split(",") if f.strip()]
+    bad = [f for f in cols if f not in PATIENT_FIELDS]
+    if bad:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(bad)}")
+    return ["id"] + [f for f in cols if f != "id"]  # id is the keyset cursor
+
+def _patient_page(session: Session, cols: list[str], after_id: Optional[int], limit: int, q: Optional[str] = None):
+    stmt = select(*[getattr(Patient, c) for c in cols]).order_by(Patient.id).limit(limit)
+    if after_id is not None:
+        stmt = stmt.where(Patient.id > after_id)
+    if q:
+        stmt = stmt.where(patient_search_clause(q))
+    rows = session.exec(stmt).all()
+    if len(cols) == 1:
+        rows = [(r,) for r in rows]  # single-column selects come back as scalars
+    return [
+        {c: (v.isoformat() if isinstance(v, datetime) else v) for c, v in zip(cols, row)}
+        for row in rows
+    ]
+
 @app.get("/patients")
-def list_patients(doctor: Doctor = Depends(get_current_doctor)):
+def list_patients(
+    response: Response,
+    q: Optional[str] = Query(default=None, description="MRN prefix, name prefix, or 'first last' prefixes"),
+    after_id: Optional[int] = Query(default=None, description="keyset cursor (X-Next-Cursor of the previous page)"),
+    limit: int = Query(default=PATIENT_PAGE_SIZE, ge=1, le=500, description="page size; follow X-Next-Cursor for more"),
+    fields: Optional[str] = Query(default=None, description="comma-separated projection, e.g. id,mrn,notes"),
+    doctor: Doctor = Depends(get_current_doctor),
+):
+    cols = _patient_columns(fields)
     with get_session() as session:
-        pts = session.exec(select(Patient)).all()
-        return [{"id":x.id,"first_name":x.first_name,"last_name":x.last_name,"dob":x.dob,"mrn":x.mrn,"notes":x.notes} for x in pts]
+        items = _patient_page(session, cols, after_id, limit, q)
+    if len(items) == limit:
+        response.headers["X-Next-Cursor"] = str(items[-1]["id"])
+    return items
+
+@app.get("/patients/export")
+def export_patients(doctor: Doctor = Depends(get_current_doctor)):
+    """Full export (all fields) streamed as one JSON array, fetched in keyset batches."""
+    def _stream():
+        yield "["
+        first, after_id = True, None
+        with get_session() as session:
+            while True:
+                batch = _patient_page(session, PATIENT_FIELDS, after_id, EXPORT_BATCH)
+                for item in batch:
+                    yield ("" if first else ",") + json.dumps(item)
+                    first = False
+                if len(batch) < EXPORT_BATCH:
+                    break
+                after_id = batch[-1]["id"]
+        yield "]"
+
+    return StreamingResponse(_stream(), media_type="application/json",
+                             headers={"Content-Disposition": 'attachment; filename="patients.json"'})
 
 @app.patch("/patients/{patient_id}")
 def update_patient(patient_id: int, p: PatientUpdate, doctor: Doctor = Depends(get_current_doctor)):
@@ -105,7 +270,12 @@ def update_patient(patient_id: int, p: PatientUpdate, doctor: Doctor = Depends(g
         pat = session.get(Patient, patient_id)
         if not pat: raise HTTPException(status_code=404, detail="Not found")
         for k,v in p.model_dump(exclude_unset=True).items(): setattr(pat, k, v)
-        session.add(pat); session.commit()
+        session.add(pat)
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            raise HTTPException(status_code=400, detail="MRN already exists")
         return {"ok": True}
 
 @app.delete("/patients/{patient_id}")
@@ -113,20 +283,36 @@ def delete_patient(patient_id: int, doctor: Doctor = Depends(get_current_doctor)
     with get_session() as session:
         pat = session.get(Patient, patient_id)
         if not pat: raise HTTPException(status_code=404, detail="Not found")
+        # Same rule as delete_report: only the creating doctor may delete a report
+        others = session.exec(
+            select(func.count(Report.id)).where(Report.patient_id == patient_id, Report.doctor_id != doctor.id)
+        ).one()
+        if others:
+            raise HTTPException(status_code=409, detail="Patient has reports created by other doctors")
+        # Rows go now (reports first for the FK); their files are removed by the maintenance worker
+        rows = session.exec(
+            select(Report.image_filename, Report.report_path).where(Report.patient_id == patient_id)
+        ).all()
+        session.exec(delete(Report).where(Report.patient_id == patient_id))
         session.delete(pat); session.commit()
-        return {"ok": True}
+        for image_filename, report_path in rows:
+            maintenance.enqueue(artifact_paths(UPLOAD_DIR, image_filename, report_path).values())
+        return {"ok": True, "reports_deleted": len(rows)}
 
 # ---------- Inference + Report ----------
 @app.post("/inference")
 async def run_inference(
     patient_id: int = Form(...),
     file: UploadFile = File(...),
+    model_name: Optional[str] = Form(default=None),
+    tta: bool = Form(default=False),
+    tta_views: int = Form(default=8, ge=2, le=MAX_VIEWS),
     doctor: Doctor = Depends(get_current_doctor),
 ):
     """
     - Saves upload
     - Uses SAME preprocessing as training (crop → resize → preprocess_input)
-    - Predicts label & probability
+    - Predicts label & probability (optionally averaged over `tta_views` augmented views in one batch)
     - Computes Grad-CAM on the SAME tensor `x`
     - Generates professional PDF with logo + (optional) heatmap
     - Saves Report row and returns JSON with filenames
@@ -137,45 +323,52 @@ async def run_inference(
     with open(file_path, "wb") as f:
         f.write(await file.read())
 
-    # 1) Predict with consistent preprocessing
-    img_pil = Image.open(file_path).convert("RGB")
-    x = preprocess_for_model(img_pil, model)          # (1, H, W, 3) — EXACTLY like training
-    preds = model.predict(x, verbose=0)               # (1, C) or (1, 1)
-
-    # Handle binary vs multiclass
-    num_outputs = preds.shape[-1]
-    if num_outputs == 1:
-        # Binary sigmoid → probability of positive class (assumed "tumor")
-        score = float(preds[0][0])
-        label = "tumor" if score >= 0.5 else "no_tumor"
-        prob  = score if label == "tumor" else (1.0 - score)
-        class_index_for_cam = 0  # single logit
-    else:
-        # Multiclass softmax
-        idx   = int(np.argmax(preds[0]))
-        prob  = float(preds[0][idx])
-        # Make sure CLASSES matches your training order
-        label = CLASSES[idx] if idx < len(CLASSES) else f"class_{idx}"
-        class_index_for_cam = idx
-
-    # 2) Grad-CAM on the SAME tensor `x` (robust even for Sequential models)
-    overlay_path = None
+    # Pin one model version for the whole request; a concurrent swap only takes effect for later requests
+    try:
+        mv = registry.pin(model_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown model")
     try:
-        # ensure model has concrete inputs/outputs (needed if Sequential without explicit Input)
-        ensure_built(model, (x.shape[1], x.shape[2]))
-
-        heatmap, last_layer = gradcam_heatmap(model, x, class_index=class_index_for_cam)
-        ov_dir = os.path.join(UPLOAD_DIR, "overlays")
-        os.makedirs(ov_dir, exist_ok=True)
-        stem = os.path.splitext(file.filename)[0]
-        overlay_path = os.path.join(ov_dir, f"overlay_{stem}.png")
-
-        # Blend heatmap on the ORIGINAL saved image (keeps original resolution in the PDF)
-        save_overlay(file_path, heatmap, overlay_path, alpha=0.35, colormap="jet")
-        print(f"[GradCAM] layer={last_layer} overlay={overlay_path}")
-    except Exception as e:
-        print("[GradCAM] failed:", repr(e))
-        overlay_path = None  # PDF will show "Heatmap unavailable" gracefully
+        model = mv.model
+
+        # 1) Predict with consistent preprocessing
+        img_pil = Image.open(file_path).convert("RGB")
+        x = preprocess_for_model(img_pil, model)          # (1, H, W, 3) — EXACTLY like training
+        uncertainty = None
+        if tta:
+            preds, var = predict_tta(model, x, tta_views)  # one forward pass over K views
+        else:
+            preds = model.predict(x, verbose=0)           # (1, C) or (1, 1)
+
+        # Handle binary vs multiclass
+        label, prob, class_index_for_cam = decode_predictions(preds, mv.classes)
+        if tta:
+            uncertainty = float(var[class_index_for_cam])  # variance of the reported output across views
+        if not tta:
+            # shadow scores a single view; comparing it against a TTA average would skew the stats
+            registry.maybe_shadow(mv.name, img_pil, x, label, prob)
+
+        # 2) Grad-CAM on the SAME tensor `x` (robust even for Sequential models)
+        overlay_path = None
+        try:
+            # ensure model has concrete inputs/outputs (needed if Sequential without explicit Input)
+            ensure_built(model, (x.shape[1], x.shape[2]))
+
+            heatmap, last_layer = gradcam_heatmap(model, x, class_index=class_index_for_cam)
+            ov_dir = os.path.join(UPLOAD_DIR, "overlays")
+            os.makedirs(ov_dir, exist_ok=True)
+            stem = os.path.splitext(file.filename)[0]
+            overlay_path = os.path.join(ov_dir, f"overlay_{stem}.png")
+
+            # Blend heatmap on the ORIGINAL saved image (keeps original resolution in the PDF)
+            save_overlay(file_path, heatmap, overlay_path, alpha=0.35, colormap="jet")
+            print(f"[GradCAM] layer={last_layer} overlay={overlay_path}")
+        except Exception as e:
+            print("[GradCAM] failed:", repr(e))
+            overlay_path = None  # PDF will show "Heatmap unavailable" gracefully
+    finally:
+        model = None
+        registry.unpin(mv)
 
     # 3) Persist report + generate PDF
     os.makedirs(REPORT_DIR, exist_ok=True)
@@ -199,6 +392,8 @@ async def run_inference(
             logo_path=LOGO_PATH,
             result=label,
             prob=float(prob),
+            tta_views=(tta_views if tta else None),
+            uncertainty=uncertainty,
         )
 
         rec = Report(
@@ -208,6 +403,9 @@ async def run_inference(
             result_label=label,
             probability=float(prob),
             report_path=report_path,
+            model_version=mv.tag,
+            tta_views=(tta_views if tta else None),
+            uncertainty=uncertainty,
         )
         session.add(rec)
         session.commit()
@@ -216,6 +414,9 @@ async def run_inference(
         return {
             "label": label,
             "probability": float(prob),
+            "uncertainty": uncertainty,
+            "tta_views": rec.tta_views,
+            "model_version": rec.model_version,
             "report_id": rec.id,
             "report_file": report_filename,
             "overlay_file": (os.path.basename(overlay_path) if overlay_path else None),
@@ -223,6 +424,36 @@ async def run_inference(
 
 
 
+# ---------- Models ----------
+@app.get("/models")
+def list_models(doctor: Doctor = Depends(get_current_doctor)):
+    return registry.describe()
+
+@app.post("/models/{name}/load", status_code=202)
+def load_model_version(name: str, body: ModelLoad, admin: Doctor = Depends(get_current_admin)):
+    """Load + warm in the background, then switch traffic (or start shadow scoring)."""
+    # relative paths are taken from MODELS_DIR; anything resolving outside it is rejected
+    path = os.path.realpath(os.path.join(MODELS_DIR, body.path))
+    if os.path.commonpath([path, MODELS_DIR]) != MODELS_DIR:
+        raise HTTPException(status_code=400, detail="Model file must be inside MODELS_DIR")
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=400, detail="Model file not found")
+    registry.load(name, path, body.classes or CLASSES, version=body.version, shadow_percent=body.shadow_percent)
+    return {"ok": True, "status": "loading"}
+
+@app.post("/models/{name}/promote")
+def promote_model(name: str, admin: Doctor = Depends(get_current_admin)):
+    try:
+        mv = registry.promote_shadow(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="No shadow model")
+    return {"ok": True, "active": mv.tag}
+
+@app.delete("/models/{name}/shadow")
+def stop_shadow(name: str, admin: Doctor = Depends(get_current_admin)):
+    registry.clear_shadow(name)
+    return {"ok": True}
+
 
 @app.get("/reports/{report_file}")
 def download_report(report_file: str, doctor: Doctor = Depends(get_current_doctor)):
@@ -241,24 +472,13 @@ def delete_report(report_id: int, doctor: Doctor = Depends(get_current_doctor)):
         if r.doctor_id != doctor.id:
             raise HTTPException(status_code=403, detail="Not allowed")
 
-        # Try to remove generated files (PDF + overlay). Keep source image (optional).
-        try:
-            if r.report_path and os.path.exists(r.report_path):
-                os.remove(r.report_path)
-        except Exception:
-            pass
-
-        try:
-            stem, _ = os.path.splitext(r.image_filename or "")
-            overlay_path = os.path.join(UPLOAD_DIR, "overlays", f"overlay_{stem}.png")
-            if os.path.exists(overlay_path):
-                os.remove(overlay_path)
-        except Exception:
-            pass
-
+        paths = artifact_paths(UPLOAD_DIR, r.image_filename, r.report_path).values()
         session.delete(r)
         session.commit()
 
+    # PDF + overlay + source image are removed in the background (skipped if another report still uses them)
+    maintenance.enqueue(paths)
+
     return Response(status_code=204)
 
 
@@ -297,6 +517,9 @@ def list_reports(
                 "image_filename": r.image_filename,
                 "result_label": r.result_label,
                 "probability": r.probability,
+                "model_version": r.model_version,
+                "tta_views": r.tta_views,
+                "uncertainty": r.uncertainty,
                 "report_file": os.path.basename(r.report_path),
                 "created_at": r.created_at.isoformat() if r.created_at else None,
             })
@@ -304,6 +527,17 @@ def list_reports(
         return {"total": int(total), "items": items}
 
 
+# ---------- Maintenance ----------
+@app.get("/maintenance")
+def maintenance_stats(doctor: Doctor = Depends(get_current_doctor)):
+    return maintenance.snapshot()
+
+@app.post("/maintenance/sweep", status_code=202)
+def maintenance_sweep(doctor: Doctor = Depends(get_current_doctor)):
+    maintenance.request_sweep()
+    return {"ok": True}
+
+
 @app.get("/stats")
 def stats(doctor: Doctor = Depends(get_current_doctor)):
     # Count totals + today's scans
@@ -0,0 +1,244 @@
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import or_
+from sqlmodel import select
+
+from .database import get_session, Report
+
+
+def _env_days(name: str) -> Optional[int]:
+    """Retention in days from env; unset / 0 means keep forever."""
+    v = int(os.getenv(name, "0") or 0)
+    return v if v > 0 else None
+
+# Retention per artifact kind (days since the report was created)
+RETENTION_UPLOAD_DAYS  = _env_days("RETENTION_UPLOAD_DAYS")    # original MRI uploads
+RETENTION_OVERLAY_DAYS = _env_days("RETENTION_OVERLAY_DAYS")   # Grad-CAM overlays
+RETENTION_REPORT_DAYS  = _env_days("RETENTION_REPORT_DAYS")    # PDFs (default: keep)
+
+SWEEP_INTERVAL_SEC   = int(os.getenv("MAINTENANCE_INTERVAL_SEC", "3600"))
+MAX_DELETES_PER_SEC  = float(os.getenv("MAINTENANCE_MAX_DELETES_PER_SEC", "50"))
+BATCH_SIZE           = int(os.getenv("MAINTENANCE_BATCH", "200"))
+# Files younger than this are never swept: /inference writes them before the Report row exists
+ORPHAN_GRACE_SEC     = int(os.getenv("MAINTENANCE_ORPHAN_GRACE_SEC", "3600"))
+
+
+def artifact_paths(upload_dir: str, image_filename: Optional[str], report_path: Optional[str]) -> dict[str, str]:
+    """Files one Report owns, keyed by kind (same naming as /inference)."""
+    out = {}
+    if image_filename:
+        stem = os.path.splitext(image_filename)[0]
+        out["upload"] = os.path.abspath(os.path.join(upload_dir, image_filename))
+        out["overlay"] = os.path.abspath(os.path.join(upload_dir, "overlays", f"overlay_{stem}.png"))
+    if report_path:
+        out["report"] = os.path.abspath(report_path)
+    return out
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class MaintenanceWorker:
+    """
+    Background thread that owns all artifact deletion:
+    - `enqueue()` paths freed by deleted reports/patients (removed in batches, off the request path)
+    - periodic sweep of uploads/, uploads/overlays/ and reports/ for files no live Report needs,
+      which covers both orphans and files past their retention window
+    Deletions are paced to MAX_DELETES_PER_SEC so the disk stays available for inference.
+    """
+
+    def __init__(self, upload_dir: str, report_dir: str):
+        self.upload_dir = upload_dir
+        self.report_dir = report_dir
+        self.retention = {
+            "upload": RETENTION_UPLOAD_DAYS,
+            "overlay": RETENTION_OVERLAY_DAYS,
+            "report": RETENTION_REPORT_DAYS,
+        }
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._sweep_now = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {
+            "files_deleted": 0,
+            "bytes_reclaimed": 0,
+            "last_sweep_at": None,
+            "last_sweep_seconds": None,
+            "last_sweep_bytes": 0,
+        }
+
+    # ---------- lifecycle ----------
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._sweep_now.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    # ---------- API ----------
+    def enqueue(self, paths: Iterable[str]) -> None:
+        for p in paths:
+            if p:
+                self._queue.put(os.path.abspath(p))
+
+    def request_sweep(self) -> None:
+        self._sweep_now.set()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "pending": self._queue.qsize(), "retention_days": dict(self.retention)}
+
+    # ---------- internals ----------
+    def _run(self) -> None:
+        next_sweep = time.monotonic() + SWEEP_INTERVAL_SEC
+        while not self._stop.is_set():
+            try:
+                self._drain_queue()
+                if self._sweep_now.is_set() or time.monotonic() >= next_sweep:
+                    self._sweep_now.clear()
+                    self.sweep()
+                    next_sweep = time.monotonic() + SWEEP_INTERVAL_SEC
+            except Exception as e:
+                print("[Maintenance] failed:", repr(e))
+            self._sweep_now.wait(timeout=1.0)
+
+    def _live_paths(self, paths: Optional[Iterable[str]] = None) -> set[str]:
+        """
+        Artifact paths still needed by some Report (within that kind's retention window).
+        With `paths`, only reports that could own one of them are read instead of the whole table.
+        """
+        now = datetime.utcnow()
+        cutoffs = {k: (now - timedelta(days=d) if d else None) for k, d in self.retention.items()}
+        stmt = select(Report.image_filename, Report.report_path, Report.created_at)
+        if paths is not None:
+            clause = self._owner_clause(paths)
+            if clause is None:
+                return set()
+            stmt = stmt.where(clause)
+        live: set[str] = set()
+        with get_session() as session:
+            for image_filename, report_path, created_at in session.exec(stmt.execution_options(yield_per=1000)):
+                for kind, path in artifact_paths(self.upload_dir, image_filename, report_path).items():
+                    cutoff = cutoffs[kind]
+                    if cutoff is None or created_at is None or created_at >= cutoff:
+                        live.add(path)
+        return live
+
+    def _owner_clause(self, paths: Iterable[str]):
+        """WHERE clause matching reports whose upload, overlay or PDF is one of `paths`."""
+        upload_dir = os.path.abspath(self.upload_dir)
+        overlay_dir = os.path.join(upload_dir, "overlays")
+        names, report_paths, overlay_stems = set(), set(), set()
+        for p in paths:
+            d, base = os.path.split(p)
+            if d == upload_dir:
+                names.add(base)
+            elif d == overlay_dir and base.startswith("overlay_") and base.endswith(".png"):
+                overlay_stems.add(base[len("overlay_"):-len(".png")])
+            else:
+                report_paths.add(p)
+        clauses = []
+        if names:
+            clauses.append(Report.image_filename.in_(names))
+        if report_paths:
+            # stored as written by /inference: REPORT_DIR joined with the PDF name
+            stored = {os.path.join(self.report_dir, os.path.basename(p)) for p in report_paths}
+            clauses.append(Report.report_path.in_(report_paths | stored))
+        for stem in overlay_stems:
+            clauses.append(or_(Report.image_filename == stem, Report.image_filename.startswith(stem + ".", autoescape=True)))
+        return or_(*clauses) if clauses else None
+
+    def _drain_queue(self) -> None:
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            batch = set(batch)
+            # Uploads keep the client's filename, so a queued path may already belong to a new scan
+            # whose Report row is not committed yet: leave young files to a later sweep.
+            grace_before = time.time() - ORPHAN_GRACE_SEC
+            mtimes = {p: _mtime(p) for p in batch}
+            old_enough = [p for p, m in mtimes.items() if m is not None and m <= grace_before]
+            if not old_enough:
+                continue
+            live = self._live_paths(old_enough)  # a same-named upload may still back another report
+            self._delete([p for p in old_enough if p not in live])
+
+    def sweep(self) -> int:
+        """Remove orphaned / expired files. Returns bytes reclaimed."""
+        t0 = time.monotonic()
+        live = self._live_paths()
+        grace_before = time.time() - ORPHAN_GRACE_SEC
+        candidates = []
+        for d in (self.upload_dir, os.path.join(self.upload_dir, "overlays"), self.report_dir):
+            if not os.path.isdir(d):
+                continue
+            with os.scandir(d) as it:
+                for entry in it:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    path = os.path.abspath(entry.path)
+                    if path in live:
+                        continue
+                    try:
+                        if entry.stat().st_mtime > grace_before:
+                            continue
+                    except FileNotFoundError:
+                        continue
+                    candidates.append(path)
+
+        reclaimed = 0
+        for i in range(0, len(candidates), BATCH_SIZE):
+            if self._stop.is_set():
+                break
+            reclaimed += self._delete(candidates[i:i + BATCH_SIZE])
+
+        with self._lock:
+            self.stats["last_sweep_at"] = datetime.utcnow().isoformat()
+            self.stats["last_sweep_seconds"] = round(time.monotonic() - t0, 3)
+            self.stats["last_sweep_bytes"] = reclaimed
+        print(f"[Maintenance] sweep removed {len(candidates)} candidate file(s), reclaimed {reclaimed} bytes")
+        return reclaimed
+
+    def _delete(self, paths: list[str]) -> int:
+        """Delete paths at no more than MAX_DELETES_PER_SEC. Returns bytes reclaimed."""
+        interval = 1.0 / MAX_DELETES_PER_SEC if MAX_DELETES_PER_SEC > 0 else 0.0
+        deleted = reclaimed = 0
+        for path in paths:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                print(f"[Maintenance] could not delete {path}: {e!r}")
+                continue
+            deleted += 1
+            reclaimed += size
+            if interval:
+                time.sleep(interval)
+        with self._lock:
+            self.stats["files_deleted"] += deleted
+            self.stats["bytes_reclaimed"] += reclaimed
+        return reclaimed
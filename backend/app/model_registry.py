@@ -0,0 +1,258 @@
+import gc
+import os
+import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from .model_tf import load_keras_model, decode_predictions
+from app.vision.preprocess import infer_input_size, preprocess_for_model
+
+
+class ModelVersion:
+    """
+    One loaded set of weights. `inflight` counts requests currently using it so a
+    retired version is only dropped after the last of them finishes.
+    """
+
+    def __init__(self, name: str, version: str, path: str, model, classes: list[str]):
+        self.name = name
+        self.version = version
+        self.path = path
+        self.model = model
+        self.classes = classes
+        self.loaded_at = datetime.utcnow()
+        self.inflight = 0
+        self.retired = False
+        # shadow scoring stats (only filled while this version is a shadow candidate)
+        self.shadow_scored = 0
+        self.shadow_agree = 0
+        self.shadow_abs_diff = 0.0
+        self.shadow_skipped = 0  # sampled while the previous shadow job was still pending
+
+    @property
+    def tag(self) -> str:
+        return f"{self.name}:{self.version}"
+
+    def info(self) -> dict:
+        return {
+            "name": self.name,
+            "version": self.version,
+            "path": self.path,
+            "classes": self.classes,
+            "loaded_at": self.loaded_at.isoformat(),
+            "inflight": self.inflight,
+        }
+
+    def shadow_info(self) -> dict:
+        n = self.shadow_scored
+        return {
+            "scored": n,
+            "agreement": (self.shadow_agree / n) if n else None,
+            "mean_abs_prob_diff": (self.shadow_abs_diff / n) if n else None,
+            "skipped": self.shadow_skipped,
+        }
+
+
+def _warm_up(model) -> None:
+    """Run one dummy forward pass so the first real request does not pay graph tracing."""
+    h, w = infer_input_size(model)
+    model.predict(np.zeros((1, h, w, 3), dtype=np.float32), verbose=0)
+
+
+class ModelRegistry:
+    """
+    Holds several named models, each with one ACTIVE version and an optional SHADOW candidate.
+
+    - `load()` loads + warms a new version on a background thread, then swaps it in atomically
+    - `pin()`/`unpin()` (or `acquire()`) keep the active version alive for a whole request
+    - `maybe_shadow()` asynchronously scores a fraction of traffic on the candidate
+    """
+
+    def __init__(self, default_name: str):
+        self.default_name = default_name
+        self._active: dict[str, ModelVersion] = {}
+        self._shadow: dict[str, tuple[ModelVersion, float]] = {}
+        self._shadow_busy: set[str] = set()          # names with a shadow job queued or running
+        self._load_status: dict[str, dict] = {}      # name -> last background load (state, error, ...)
+        self._lock = threading.Lock()
+        # one loader so two uploads of weights never race each other for memory
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-load")
+        self._shadow_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-shadow")
+
+    # ---------- loading / switching ----------
+    def _build(self, name: str, path: str, version: Optional[str], classes: list[str]) -> ModelVersion:
+        model = load_keras_model(path)
+        _warm_up(model)
+        version = version or os.path.splitext(os.path.basename(path or ""))[0] or "default"
+        return ModelVersion(name, version, path, model, classes)
+
+    def load_sync(self, name: str, path: str, classes: list[str], version: Optional[str] = None) -> ModelVersion:
+        """Blocking load + activate (used at startup)."""
+        mv = self._build(name, path, version, classes)
+        self._activate(mv)
+        return mv
+
+    def load(
+        self,
+        name: str,
+        path: str,
+        classes: list[str],
+        version: Optional[str] = None,
+        shadow_percent: Optional[float] = None,
+    ) -> Future:
+        """
+        Load in the background. If `shadow_percent` is given the new version becomes the shadow
+        candidate for `name` instead of taking traffic; otherwise it replaces the active version.
+        """
+        target = "shadow" if shadow_percent is not None else "active"
+        self._set_load_status(name, state="loading", path=path, version=version, target=target)
+
+        def _job() -> ModelVersion:
+            mv = self._build(name, path, version, classes)
+            if shadow_percent is None:
+                self._activate(mv)
+            else:
+                self._set_shadow(mv, shadow_percent)
+            self._set_load_status(name, state="ok", path=path, version=mv.version, target=target)
+            print(f"[Registry] loaded {mv.tag} ({target})")
+            return mv
+
+        def _report(f: Future) -> None:
+            if f.exception() is not None:
+                self._set_load_status(name, state="failed", path=path, version=version, target=target,
+                                      error=repr(f.exception()))
+                print("[Registry] load failed:", repr(f.exception()))
+
+        fut = self._loader.submit(_job)
+        fut.add_done_callback(_report)
+        return fut
+
+    def _set_load_status(self, name: str, **status) -> None:
+        with self._lock:
+            self._load_status[name] = {**status, "at": datetime.utcnow().isoformat()}
+
+    def _activate(self, mv: ModelVersion) -> None:
+        with self._lock:
+            old = self._active.get(mv.name)
+            self._active[mv.name] = mv
+        self._retire(old)
+
+    def _set_shadow(self, mv: ModelVersion, percent: float) -> None:
+        with self._lock:
+            old = self._shadow.get(mv.name)
+            self._shadow[mv.name] = (mv, max(0.0, min(100.0, float(percent))))
+        self._retire(old[0] if old else None)
+
+    def clear_shadow(self, name: str) -> None:
+        with self._lock:
+            old = self._shadow.pop(name, None)
+        self._retire(old[0] if old else None)
+
+    def promote_shadow(self, name: str) -> ModelVersion:
+        """Make the current shadow candidate the active version."""
+        with self._lock:
+            entry = self._shadow.pop(name, None)
+        if entry is None:
+            raise KeyError(name)
+        self._activate(entry[0])
+        return entry[0]
+
+    def _retire(self, mv: Optional[ModelVersion]) -> None:
+        if mv is None:
+            return
+        with self._lock:
+            mv.retired = True
+            drop = mv.inflight == 0
+        if drop:
+            self._release(mv)
+
+    @staticmethod
+    def _release(mv: ModelVersion) -> None:
+        print(f"[Registry] releasing {mv.tag}")
+        mv.model = None
+        gc.collect()
+
+    # ---------- serving ----------
+    def pin(self, name: Optional[str] = None) -> ModelVersion:
+        """Pin the active version of `name`; it stays alive until `unpin()`. Raises KeyError."""
+        name = name or self.default_name
+        with self._lock:
+            mv = self._active.get(name)
+            if mv is None:
+                raise KeyError(name)
+            mv.inflight += 1
+        return mv
+
+    def unpin(self, mv: ModelVersion) -> None:
+        with self._lock:
+            mv.inflight -= 1
+            drop = mv.retired and mv.inflight == 0
+        if drop:
+            self._release(mv)
+
+    @contextmanager
+    def acquire(self, name: Optional[str] = None):
+        mv = self.pin(name)
+        try:
+            yield mv
+        finally:
+            self.unpin(mv)
+
+    def maybe_shadow(self, name: str, img, x: np.ndarray, primary_label: str, primary_prob: float) -> None:
+        """
+        Score the request on the shadow candidate for a sampled fraction of traffic; never blocks the caller.
+        `x` is the active model's tensor for PIL image `img`; it is reused when the candidate has the same
+        input size, otherwise `img` is preprocessed again for the candidate.
+        At most one shadow job per name is pending: samples arriving while it runs are skipped, not queued.
+        """
+        with self._lock:
+            entry = self._shadow.get(name)
+            if entry is None or random.random() * 100.0 >= entry[1]:
+                return
+            mv = entry[0]
+            if name in self._shadow_busy:
+                mv.shadow_skipped += 1
+                return
+            self._shadow_busy.add(name)
+            mv.inflight += 1
+
+        def _job():
+            try:
+                xs = x if tuple(x.shape[1:3]) == infer_input_size(mv.model) else preprocess_for_model(img, mv.model)
+                preds = mv.model.predict(xs, verbose=0)
+                label, prob, _ = decode_predictions(preds, mv.classes)
+                with self._lock:
+                    mv.shadow_scored += 1
+                    mv.shadow_agree += int(label == primary_label)
+                    mv.shadow_abs_diff += abs(prob - primary_prob)
+            except Exception as e:
+                print("[Registry] shadow scoring failed:", repr(e))
+            finally:
+                with self._lock:
+                    self._shadow_busy.discard(name)
+                self.unpin(mv)
+
+        self._shadow_pool.submit(_job)
+
+    def describe(self) -> list[dict]:
+        with self._lock:
+            out = []
+            for name in sorted(set(self._active) | set(self._shadow) | set(self._load_status)):
+                active = self._active.get(name)
+                shadow = self._shadow.get(name)
+                out.append({
+                    "name": name,
+                    "default": name == self.default_name,
+                    "active": active.info() if active else None,
+                    "shadow": (
+                        {**shadow[0].info(), "percent": shadow[1], **shadow[0].shadow_info()}
+                        if shadow else None
+                    ),
+                    "last_load": self._load_status.get(name),
+                })
+            return out
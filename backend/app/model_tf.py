@@ -62,3 +62,20 @@ def predict(model, img: Image.Image) -> tuple[str, float]:
     label = "tumor" if prob >= 0.5 else "no_tumor"
     conf = prob if label == "tumor" else (1.0 - prob)
     return label, conf
+
+def decode_predictions(preds: np.ndarray, classes: list[str]) -> tuple[str, float, int]:
+    """
+    Turn raw model output for ONE image into (label, probability, class_index).
+    Binary sigmoid (1 output) -> 'tumor' / 'no_tumor'; multiclass softmax -> classes[argmax].
+    """
+    preds = np.asarray(preds)
+    if preds.shape[-1] == 1:
+        score = float(preds[0][0])
+        label = "tumor" if score >= 0.5 else "no_tumor"
+        prob = score if label == "tumor" else (1.0 - score)
+        return label, prob, 0  # single logit
+    idx = int(np.argmax(preds[0]))
+    prob = float(preds[0][idx])
+    # Make sure classes matches your training order
+    label = classes[idx] if idx < len(classes) else f"class_{idx}"
+    return label, prob, idx
@@ -0,0 +1,45 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """
+    In-process token buckets keyed by an arbitrary string (e.g. "ip:1.2.3.4", "email:a@b.c").
+    Each key holds up to `capacity` tokens and refills at `rate` tokens/second.
+    Beyond `max_keys` the least recently seen keys are evicted (they restart with a full bucket).
+    """
+
+    def __init__(self, capacity: float, rate: float, max_keys: int = 100_000):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()  # key -> (tokens, last_seen), LRU order
+        self._lock = threading.Lock()
+
+    def _wait(self, tokens: float, cost: float) -> float:
+        if tokens >= cost:
+            return 0.0
+        return (cost - tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def hit(self, key: str, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens from `key`. Returns 0.0 if allowed, otherwise the seconds
+        until enough tokens are available (nothing is taken in that case).
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            wait = self._wait(tokens, cost)
+            self._buckets[key] = (tokens if wait else tokens - cost, now)  # re-inserted as most recent
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def peek(self, key: str, cost: float = 1.0) -> float:
+        """Same answer as `hit()` but takes nothing (and does not create a bucket for a new key)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.capacity, now))
+            return self._wait(min(self.capacity, tokens + (now - last) * self.rate), cost)
@@ -72,7 +72,9 @@ def generate_report(
     image_path: str | None = None,
     heatmap_path: str | None = None,
     organization: str | None = "NeuroScan Imaging",
-    logo_path: str | None = None
+    logo_path: str | None = None,
+    tta_views: int | None = None,
+    uncertainty: float | None = None
 ):
     c = canvas.Canvas(path, pagesize=A4)
     page_w, page_h = A4
@@ -93,7 +95,11 @@ def generate_report(
 
     _kv(c, 2.0*cm, y, "Prediction", result.capitalize())
     y -= 0.7*cm
-    _kv(c, 2.0*cm, y, "Probability", f"{prob*100:.1f}%")
+    prob_txt = f"{prob*100:.1f}%"
+    if tta_views:
+        prob_txt += f"  (mean of {tta_views} augmented views"
+        prob_txt += f", variance {uncertainty:.4f})" if uncertainty is not None else ")"
+    _kv(c, 2.0*cm, y, "Probability", prob_txt)
     y -= 1.2*cm  # safe spacing before next box
 
 
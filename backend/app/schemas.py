@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, constr
-from typing import Optional
+from typing import List, Optional
 
 class DoctorCreate(BaseModel):
     email: EmailStr
@@ -23,3 +23,9 @@ class PatientUpdate(BaseModel):
     dob: Optional[str] = None
     mrn: Optional[str] = None
     notes: Optional[str] = None
+
+class ModelLoad(BaseModel):
+    path: str                                 # file inside MODELS_DIR (relative or absolute)
+    version: Optional[str] = None
+    classes: Optional[List[str]] = None       # defaults to CLASSES env
+    shadow_percent: Optional[float] = None    # set → load as shadow candidate instead of switching traffic
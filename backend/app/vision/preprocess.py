@@ -5,6 +5,7 @@ import tensorflow as tf
 
 # If your saved model ALREADY has a Rescaling/Preprocessing layer, set this False
 USE_EXTERNAL_PREPROCESS = True  # keep True to match your training
+CROP_ADD_PIXELS = 8  # margin kept around the foreground crop
 
 def infer_input_size(model) -> tuple[int, int]:
     ish = model.input_shape
@@ -15,10 +16,10 @@ def infer_input_size(model) -> tuple[int, int]:
         h = w = None
     return int(h or 224), int(w or 224)
 
-def _crop_single(img_rgb: np.ndarray, add_pixels: int = 8) -> np.ndarray:
+def _crop_box(img_rgb: np.ndarray, add_pixels: int = CROP_ADD_PIXELS) -> tuple[int, int, int, int]:
     """
     img_rgb: HxWx3, RGB (uint8)
-    Returns cropped RGB.
+    Returns (x0, y0, x1, y1) of the foreground crop.
     """
     h, w = img_rgb.shape[:2]
     gray = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY)
@@ -29,19 +30,45 @@ def _crop_single(img_rgb: np.ndarray, add_pixels: int = 8) -> np.ndarray:
 
     cnts, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     if not cnts:
-        x0, y0, x1, y1 = 0, 0, w, h
-    else:
-        c = max(cnts, key=cv2.contourArea)
-        x, y, cw, ch = cv2.boundingRect(c)
-        x0 = max(0, x - add_pixels)
-        y0 = max(0, y - add_pixels)
-        x1 = min(w, x + cw + add_pixels)
-        y1 = min(h, y + ch + add_pixels)
-        if x1 <= x0 or y1 <= y0:
-            x0, y0, x1, y1 = 0, 0, w, h
+        return 0, 0, w, h
+    c = max(cnts, key=cv2.contourArea)
+    x, y, cw, ch = cv2.boundingRect(c)
+    x0 = max(0, x - add_pixels)
+    y0 = max(0, y - add_pixels)
+    x1 = min(w, x + cw + add_pixels)
+    y1 = min(h, y + ch + add_pixels)
+    if x1 <= x0 or y1 <= y0:
+        return 0, 0, w, h
+    return x0, y0, x1, y1
 
+def _crop_single(img_rgb: np.ndarray, add_pixels: int = CROP_ADD_PIXELS) -> np.ndarray:
+    """
+    img_rgb: HxWx3, RGB (uint8)
+    Returns cropped RGB.
+    """
+    x0, y0, x1, y1 = _crop_box(img_rgb, add_pixels)
     return img_rgb[y0:y1, x0:x1]
 
+def crop_and_resize(img_pil: Image.Image, hw: tuple[int, int], add_pixels: int = CROP_ADD_PIXELS):
+    """
+    Steps 1-3 of preprocess_for_model (RGB → crop → resize), without normalization.
+    Returns: ((H, W, 3) uint8, crop box (x0, y0, x1, y1))
+    """
+    arr = np.asarray(img_pil.convert("RGB"))
+    x0, y0, x1, y1 = _crop_box(arr, add_pixels)
+    h, w = hw
+    crop_resized = cv2.resize(arr[y0:y1, x0:x1], (w, h), interpolation=cv2.INTER_AREA)
+    return crop_resized, (x0, y0, x1, y1)
+
+def normalize(x: np.ndarray) -> np.ndarray:
+    """
+    Step 4 of preprocess_for_model: (..., H, W, 3) uint8/float → float32 model input.
+    """
+    x = x.astype("float32")
+    if USE_EXTERNAL_PREPROCESS:
+        x = tf.keras.applications.resnet50.preprocess_input(x)
+    return x
+
 def preprocess_for_model(img_pil: Image.Image, model) -> np.ndarray:
     """
     Replicates your training prep:
@@ -51,13 +78,5 @@ def preprocess_for_model(img_pil: Image.Image, model) -> np.ndarray:
     4) ResNet50 preprocess_input (if external preprocessing is used)
     Returns: (1, H, W, 3) float32
     """
-    rgb = img_pil.convert("RGB")
-    arr = np.asarray(rgb)
-    crop = _crop_single(arr)  # RGB
-    h, w = infer_input_size(model)
-    crop_resized = cv2.resize(crop, (w, h), interpolation=cv2.INTER_AREA)
-    x = crop_resized.astype("float32")
-    x = np.expand_dims(x, axis=0)
-    if USE_EXTERNAL_PREPROCESS:
-        x = tf.keras.applications.resnet50.preprocess_input(x)
-    return x
+    crop_resized, _ = crop_and_resize(img_pil, infer_input_size(model))
+    return normalize(np.expand_dims(crop_resized, axis=0))
@@ -0,0 +1,173 @@
+"""
+Memory-mapped store of preprocessed crops, so re-scoring an archive skips JPEG decode + crop/resize.
+
+    cd backend
+    python -m app.vision.tensor_store --src ../Brain_Tumor_Detection --out .eval_cache/bt_store
+
+Writes `<out>.npy` — (N, H, W, 3) uint8 crops, exactly steps 1-3 of preprocess_for_model —
+and `<out>.index.json` (path → row, sha1, crop box, preprocessing params).
+Readers slice batches straight out of the mmap and apply `normalize()` on the fly.
+"""
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+import numpy as np
+from PIL import Image
+
+from . import preprocess as vp
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+# Bump when crop_and_resize changes in a way that alters its output
+PREPROCESS_VERSION = 1
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _list_images(src_dir: str) -> list[str]:
+    out = []
+    for root, _, files in os.walk(src_dir):
+        out.extend(os.path.join(root, f) for f in files if f.lower().endswith(IMAGE_EXTS))
+    return sorted(os.path.abspath(p) for p in out)
+
+def _params(hw: tuple[int, int], add_pixels: int) -> dict:
+    return {"size": list(hw), "add_pixels": add_pixels, "version": PREPROCESS_VERSION}
+
+def _crop(path: str, hw: tuple[int, int], add_pixels: int):
+    with Image.open(path) as im:
+        return vp.crop_and_resize(im, hw, add_pixels)
+
+
+class TensorStore:
+    """Read side: an open (N, H, W, 3) uint8 memmap plus its index."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        with open(prefix + ".index.json") as f:
+            meta = json.load(f)
+        self.params = meta["params"]
+        self.entries: list[dict] = meta["rows"]
+        self.row_of = {e["path"]: e["row"] for e in self.entries}
+        self.array = np.load(prefix + ".npy", mmap_mode="r")
+        # sync() swaps the .npy before the index: a crash in between leaves them disagreeing
+        expected = (len(self.entries), *self.params["size"], 3)
+        if self.array.shape != expected or self.array.dtype != np.uint8:
+            raise ValueError(f"{prefix}.npy is {self.array.shape} {self.array.dtype}, index expects {expected} uint8")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def hw(self) -> tuple[int, int]:
+        return tuple(self.params["size"])
+
+    def is_stale(self, src_dir: str, hw: tuple[int, int], add_pixels: int = vp.CROP_ADD_PIXELS) -> bool:
+        """True if preprocessing params changed or any source file was added/removed/modified."""
+        if self.params != _params(hw, add_pixels):
+            return True
+        paths = _list_images(src_dir)
+        if len(paths) != len(self.entries):
+            return True
+        for p in paths:
+            row = self.row_of.get(p)
+            if row is None:
+                return True
+            e = self.entries[row]
+            st = os.stat(p)
+            if (st.st_mtime_ns, st.st_size) != (e["mtime_ns"], e["size"]):
+                return True
+        return False
+
+    def batches(self, rows: Optional[list[int]] = None, batch_size: int = 32) -> Iterator[tuple[int, np.ndarray]]:
+        """
+        Yields (offset, normalized float32 batch). With `rows=None` batches are contiguous mmap
+        slices (no copy until normalize); an explicit row list is gathered batch by batch.
+        """
+        n = len(self.entries) if rows is None else len(rows)
+        for s in range(0, n, batch_size):
+            raw = self.array[s:s + batch_size] if rows is None else self.array[np.asarray(rows[s:s + batch_size])]
+            yield s, vp.normalize(raw)
+
+    @classmethod
+    def sync(cls, src_dir: str, prefix: str, hw: tuple[int, int], add_pixels: int = vp.CROP_ADD_PIXELS, workers: int = 4) -> "TensorStore":
+        """
+        Build or refresh the store for `src_dir`. Unchanged files (same mtime+size, or same sha1)
+        reuse their existing row; new/changed files are cropped; params changes force a full rebuild.
+        """
+        params = _params(hw, add_pixels)
+        old: Optional[TensorStore] = None
+        if os.path.exists(prefix + ".index.json") and os.path.exists(prefix + ".npy"):
+            try:
+                old = cls(prefix)
+            except (OSError, ValueError, KeyError, json.JSONDecodeError):
+                old = None
+            if old is not None and old.params != params:
+                old = None
+        if old is not None and not old.is_stale(src_dir, hw, add_pixels):
+            return old
+
+        paths = _list_images(src_dir)
+        old_by_path = {e["path"]: e for e in old.entries} if old else {}
+        old_by_sha = {e["sha1"]: e for e in old.entries} if old else {}
+
+        entries, reuse, todo = [], {}, []
+        for row, p in enumerate(paths):
+            st = os.stat(p)
+            e = {"path": p, "row": row, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+            prev = old_by_path.get(p)
+            if prev and (prev["mtime_ns"], prev["size"]) == (st.st_mtime_ns, st.st_size):
+                e["sha1"], e["box"] = prev["sha1"], prev["box"]
+                reuse[row] = prev["row"]
+            else:
+                e["sha1"] = file_hash(p)
+                prev = old_by_sha.get(e["sha1"])
+                if prev:
+                    e["box"] = prev["box"]
+                    reuse[row] = prev["row"]
+                else:
+                    todo.append(row)
+            entries.append(e)
+
+        h, w = hw
+        os.makedirs(os.path.dirname(os.path.abspath(prefix)), exist_ok=True)
+        tmp_npy = prefix + ".tmp.npy"
+        out = np.lib.format.open_memmap(tmp_npy, mode="w+", dtype=np.uint8, shape=(len(paths), h, w, 3))
+        for row, old_row in reuse.items():
+            out[row] = old.array[old_row]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for row, (crop, box) in zip(todo, pool.map(lambda r: _crop(paths[r], hw, add_pixels), todo)):
+                out[row] = crop
+                entries[row]["box"] = [int(v) for v in box]
+        out.flush()
+        del out
+        if old is not None:
+            del old.array  # release the old mmap before replacing the file
+
+        tmp_idx = prefix + ".index.tmp.json"
+        with open(tmp_idx, "w") as f:
+            json.dump({"params": params, "rows": entries}, f)
+        os.replace(tmp_npy, prefix + ".npy")
+        os.replace(tmp_idx, prefix + ".index.json")
+        print(f"[TensorStore] {prefix}: {len(paths)} rows ({len(todo)} cropped, {len(reuse)} reused)")
+        return cls(prefix)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--src", required=True)
+    ap.add_argument("--out", required=True, help="path prefix for <out>.npy / <out>.index.json")
+    ap.add_argument("--size", type=int, nargs=2, default=[224, 224], metavar=("H", "W"))
+    ap.add_argument("--add-pixels", type=int, default=vp.CROP_ADD_PIXELS)
+    args = ap.parse_args()
+    TensorStore.sync(args.src, args.out, tuple(args.size), args.add_pixels)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+import cv2
+
+# (horizontal flip, rotation degrees, scale) per view; view 0 is the untouched input
+TTA_TRANSFORMS = [
+    (False, 0.0, 1.00),
+    (True,  0.0, 1.00),
+    (False, 5.0, 1.00),
+    (False, -5.0, 1.00),
+    (False, 0.0, 1.05),
+    (False, 0.0, 0.95),
+    (True,  5.0, 1.00),
+    (True, -5.0, 1.00),
+    (True,  0.0, 1.05),
+    (True,  0.0, 0.95),
+]
+MAX_VIEWS = len(TTA_TRANSFORMS)
+
+def augment_views(x: np.ndarray, k: int = 8) -> np.ndarray:
+    """
+    x: (1, H, W, 3) float32 — the output of preprocess_for_model (already mean-subtracted).
+    Returns: (K, H, W, 3) float32 batch of flipped / slightly rotated / scaled views.
+    Border fill is 0, i.e. the ResNet mean pixel, so padding looks like background.
+    """
+    k = max(1, min(int(k), MAX_VIEWS))
+    img = x[0]
+    h, w = img.shape[:2]
+    center = (w / 2.0, h / 2.0)
+    out = np.empty((k, h, w, img.shape[2]), dtype=np.float32)
+    for i, (flip, angle, scale) in enumerate(TTA_TRANSFORMS[:k]):
+        v = img[:, ::-1] if flip else img
+        if angle or scale != 1.0:
+            m = cv2.getRotationMatrix2D(center, angle, scale)
+            v = cv2.warpAffine(np.ascontiguousarray(v), m, (w, h),
+                               flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+        out[i] = v
+    return out
+
+def predict_tta(model, x: np.ndarray, k: int = 8) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Scores K augmented views of `x` in ONE forward pass.
+    Returns: (mean preds shaped (1, C) like model.predict, per-output variance shaped (C,))
+    """
+    batch = augment_views(x, k)
+    preds = np.asarray(model.predict(batch, batch_size=len(batch), verbose=0))  # (K, C)
+    return preds.mean(axis=0, keepdims=True), preds.var(axis=0)
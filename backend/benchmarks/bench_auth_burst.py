@@ -0,0 +1,91 @@
+"""
+Inference latency during a login burst.
+
+Runs a steady stream of single-image model.predict calls on the event loop (like /inference)
+while N password verifications fire at once, comparing:
+  - idle              : no logins
+  - unbounded threads : every verify on its own thread (what the old sync handlers amounted to)
+  - bounded pool      : verify_and_update_async (AUTH_HASH_WORKERS threads, AUTH_HASH_MAX_PENDING cap)
+
+    cd backend
+    AUTH_PBKDF2_ROUNDS=320000 python -m benchmarks.bench_auth_burst --logins 64 [--model path.h5]
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.auth import pwd_context, verify_and_update_async, HashPoolBusy, HASH_WORKERS, HASH_MAX_PENDING
+from app.model_tf import load_keras_model
+from app.vision.preprocess import infer_input_size
+
+async def _inference_loop(model, x, stop: asyncio.Event, lat: list[float]):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        model.predict(x, verbose=0)
+        lat.append(time.perf_counter() - t0)
+        await asyncio.sleep(0)  # let other coroutines (the logins) run between requests
+
+def _unbounded_burst(n: int, pw: str, stored: str) -> list[threading.Thread]:
+    threads = [threading.Thread(target=pwd_context.verify, args=(pw, stored)) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads
+
+async def _bounded_burst(n: int, pw: str, stored: str) -> int:
+    async def one():
+        try:
+            await verify_and_update_async(pw, stored)
+            return 0
+        except HashPoolBusy:
+            return 1
+    return sum(await asyncio.gather(*[one() for _ in range(n)]))
+
+async def _run(mode: str, model, x, n: int, pw: str, stored: str, seconds: float) -> dict:
+    stop = asyncio.Event()
+    lat: list[float] = []
+    loop_task = asyncio.create_task(_inference_loop(model, x, stop, lat))
+    await asyncio.sleep(0.2)
+    rejected = 0
+    t0 = time.perf_counter()
+    if mode == "unbounded":
+        threads = _unbounded_burst(n, pw, stored)
+        while any(t.is_alive() for t in threads):
+            await asyncio.sleep(0.01)
+    elif mode == "bounded":
+        rejected = await _bounded_burst(n, pw, stored)
+    else:
+        await asyncio.sleep(seconds)
+    burst = time.perf_counter() - t0
+    stop.set()
+    await loop_task
+    a = np.asarray(lat) * 1000
+    return {"mode": mode, "burst_s": burst, "n": len(a), "p50": np.percentile(a, 50),
+            "p95": np.percentile(a, 95), "max": a.max(), "rejected": rejected}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default=os.getenv("MODEL_PATH"))
+    ap.add_argument("--logins", type=int, default=64)
+    ap.add_argument("--idle-seconds", type=float, default=3.0)
+    args = ap.parse_args()
+
+    model = load_keras_model(args.model)
+    h, w = infer_input_size(model)
+    x = np.zeros((1, h, w, 3), dtype=np.float32)
+    model.predict(x, verbose=0)  # warm up
+
+    pw = "correct horse battery staple"
+    stored = pwd_context.hash(pw)
+    print(f"scheme={pwd_context.identify(stored)} workers={HASH_WORKERS} max_pending={HASH_MAX_PENDING} "
+          f"logins={args.logins} cpus={os.cpu_count()}")
+    for mode in ("idle", "unbounded", "bounded"):
+        r = asyncio.run(_run(mode, model, x, args.logins, pw, stored, args.idle_seconds))
+        print(f"{r['mode']:>10}: predict p50 {r['p50']:7.1f} ms  p95 {r['p95']:7.1f} ms  max {r['max']:7.1f} ms"
+              f"  ({r['n']} calls, burst {r['burst_s']:.2f}s, rejected {r['rejected']})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Test-time augmentation cost: K sequential model.predict calls vs one K-view batch.
+
+    cd backend
+    python -m benchmarks.bench_tta --views 8 --repeats 5 [--model path/to/weights.h5] [--image scan.jpg]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from app.model_tf import load_keras_model
+from app.vision.preprocess import preprocess_for_model, infer_input_size
+from app.vision.tta import augment_views, predict_tta
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default=os.getenv("MODEL_PATH"))
+    ap.add_argument("--image", default=None, help="defaults to random noise")
+    ap.add_argument("--views", type=int, default=8)
+    ap.add_argument("--repeats", type=int, default=5)
+    args = ap.parse_args()
+
+    model = load_keras_model(args.model)
+    if args.image:
+        x = preprocess_for_model(Image.open(args.image), model)
+    else:
+        h, w = infer_input_size(model)
+        x = np.random.default_rng(0).uniform(-120, 120, (1, h, w, 3)).astype("float32")
+
+    views = augment_views(x, args.views)
+    k = len(views)
+
+    # warm up both code paths (graph tracing for batch sizes 1 and K)
+    model.predict(views[:1], verbose=0)
+    predict_tta(model, x, k)
+
+    seq = _best_of(lambda: [model.predict(views[i:i + 1], verbose=0) for i in range(k)], args.repeats)
+    single = _best_of(lambda: model.predict(x, verbose=0), args.repeats)
+    batched = _best_of(lambda: predict_tta(model, x, k), args.repeats)
+
+    print(f"views={k}")
+    print(f"single predict      : {single * 1000:8.1f} ms")
+    print(f"{k} sequential predict: {seq * 1000:8.1f} ms")
+    print(f"TTA batch of {k}      : {batched * 1000:8.1f} ms  ({seq / batched:.1f}x faster than sequential)")
+
+if __name__ == "__main__":
+    main()
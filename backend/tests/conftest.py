@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# app.database builds its engine at import time: always point it at a throwaway SQLite file first,
+# never at whatever DATABASE_URL the shell happens to export (fixtures drop and recreate tables)
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DATABASE_URL"] = "sqlite:///" + TEST_DB_PATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
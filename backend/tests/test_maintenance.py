@@ -0,0 +1,97 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import SQLModel
+
+from app import maintenance as mt
+from app.database import engine, init_db, get_session, Doctor, Patient, Report
+from conftest import TEST_DB_PATH
+
+OLD = time.time() - 2 * 3600  # older than the default 1h grace
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(mt, "MAX_DELETES_PER_SEC", 0)  # no pacing in tests
+    if engine.url.database != TEST_DB_PATH:
+        pytest.fail(f"refusing to drop tables on {engine.url!r}: not the test database")
+    SQLModel.metadata.drop_all(engine)
+    init_db()
+    with get_session() as s:
+        s.add(Doctor(id=1, email="a@x.io", full_name="A", password_hash="x"))
+        s.add(Patient(id=1, first_name="P", last_name="Q", dob="2000-01-01", mrn="M1"))
+        s.commit()
+    up, rep = tmp_path / "uploads", tmp_path / "reports"
+    (up / "overlays").mkdir(parents=True)
+    rep.mkdir()
+    return str(up), str(rep)
+
+
+def _file(path, mtime=OLD, size=10):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return os.path.abspath(path)
+
+
+def _report(image_filename, report_path, created_at=None):
+    with get_session() as s:
+        s.add(Report(patient_id=1, doctor_id=1, image_filename=image_filename, result_label="tumor",
+                     probability=0.9, report_path=report_path, created_at=created_at or datetime.utcnow()))
+        s.commit()
+
+
+def test_queued_orphans_are_deleted_and_counted(dirs):
+    up, rep = dirs
+    paths = [_file(os.path.join(up, "a.jpg")), _file(os.path.join(up, "overlays", "overlay_a.png")),
+             _file(os.path.join(rep, "r.pdf"))]
+    w = mt.MaintenanceWorker(up, rep)
+    w.enqueue(paths)
+    w._drain_queue()
+    assert not any(os.path.exists(p) for p in paths)
+    assert w.snapshot()["files_deleted"] == 3
+    assert w.snapshot()["bytes_reclaimed"] == 30
+
+
+def test_queued_file_still_referenced_is_kept(dirs):
+    up, rep = dirs
+    img = _file(os.path.join(up, "shared.jpg"))
+    ov = _file(os.path.join(up, "overlays", "overlay_shared.png"))
+    _report("shared.jpg", os.path.join(rep, "other.pdf"))
+    w = mt.MaintenanceWorker(up, rep)
+    w.enqueue([img, ov])
+    w._drain_queue()
+    assert os.path.exists(img) and os.path.exists(ov)
+
+
+def test_queued_file_within_grace_is_kept(dirs):
+    up, rep = dirs
+    fresh = _file(os.path.join(up, "new_scan.jpg"), mtime=time.time())
+    w = mt.MaintenanceWorker(up, rep)
+    w.enqueue([fresh])
+    w._drain_queue()
+    assert os.path.exists(fresh)
+
+
+def test_sweep_removes_orphans_and_expired_uploads_but_keeps_pdfs(dirs):
+    up, rep = dirs
+    orphan = _file(os.path.join(rep, "orphan.pdf"))
+    young_orphan = _file(os.path.join(up, "inflight.jpg"), mtime=time.time())
+    live_img = _file(os.path.join(up, "live.jpg"))
+    expired_img = _file(os.path.join(up, "old.jpg"))
+    old_pdf = _file(os.path.join(rep, "old.pdf"))
+    _report("live.jpg", os.path.join(rep, "live.pdf"))
+    _report("old.jpg", old_pdf, created_at=datetime.utcnow() - timedelta(days=40))
+
+    w = mt.MaintenanceWorker(up, rep)
+    w.retention["upload"] = 30  # drop originals after 30 days, keep PDFs
+    reclaimed = w.sweep()
+
+    assert not os.path.exists(orphan)
+    assert not os.path.exists(expired_img)
+    assert os.path.exists(young_orphan)
+    assert os.path.exists(live_img)
+    assert os.path.exists(old_pdf)
+    assert reclaimed == 20
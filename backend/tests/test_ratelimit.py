@@ -0,0 +1,32 @@
+from app import ratelimit
+from app.ratelimit import TokenBucketLimiter
+
+
+def test_burst_then_refill(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    lim = TokenBucketLimiter(capacity=2, rate=1.0)
+    assert lim.hit("k") == 0.0 and lim.hit("k") == 0.0
+    assert lim.hit("k") == 1.0        # empty: one second until the next token
+    now[0] += 1.0
+    assert lim.hit("k") == 0.0
+    assert lim.hit("other") == 0.0    # keys are independent
+
+
+def test_evicts_least_recently_seen_key():
+    lim = TokenBucketLimiter(capacity=1, rate=0.001, max_keys=2)
+    lim.hit("a"); lim.hit("b")
+    lim.hit("a")                      # refreshes "a"
+    lim.hit("c")                      # over max_keys → "b" goes
+    assert list(lim._buckets) == ["a", "c"]
+
+
+def test_peek_takes_nothing(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    lim = TokenBucketLimiter(capacity=1, rate=1.0)
+    assert lim.peek("k") == 0.0 and lim.peek("k") == 0.0
+    assert "k" not in lim._buckets    # peeking a new key does not allocate a bucket
+    lim.hit("k")
+    assert lim.peek("k") == 1.0       # empty now, same wait hit() would report
+    assert lim.hit("k") == 1.0
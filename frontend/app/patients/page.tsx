@@ -1,6 +1,6 @@
 "use client";
 import { useEffect, useState } from "react";
-import { api } from "../../lib/api";
+import { api, apiAll } from "../../lib/api";
 import { getToken } from "../../lib/auth";
 import Protected from "../../components/Protected";
 
@@ -12,8 +12,8 @@ function PatientsInner() {
   const token = getToken() || "";
 
   const load = async () => {
-    const res = await api("/patients", {}, token);
-    if (res.ok) setPatients(await res.json());
+    const all = await apiAll<Patient>("/patients", token);
+    if (all) setPatients(all);
   };
 
   useEffect(() => { load(); }, []);
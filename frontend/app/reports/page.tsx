@@ -2,7 +2,7 @@
 
 import { useEffect, useMemo, useState } from "react";
 import Protected from "../../components/Protected";
-import { api } from "../../lib/api";
+import { api, apiAll } from "../../lib/api";
 import { getToken } from "../../lib/auth";
 import { API_BASE } from "../../lib/config";
 
@@ -49,8 +49,8 @@ function ReportsInner() {
   // Load patients for filter
   useEffect(() => {
     (async () => {
-      const res = await api("/patients", {}, token);
-      if (res.ok) setPatients(await res.json());
+      const all = await apiAll<Patient>("/patients", token);
+      if (all) setPatients(all);
     })();
   }, [token]);
 
@@ -2,7 +2,7 @@
 
 import { useEffect, useState } from "react";
 import Protected from "../../components/Protected";
-import { api } from "../../lib/api";
+import { apiAll } from "../../lib/api";
 import { getToken } from "../../lib/auth";
 import { API_BASE } from "../../lib/config";
 
@@ -17,8 +17,8 @@ function UploadInner() {
 
   useEffect(() => {
     (async () => {
-      const res = await api("/patients", {}, token);
-      if (res.ok) setPatients(await res.json());
+      const all = await apiAll<Patient>("/patients", token);
+      if (all) setPatients(all);
     })();
   }, [token]);
 
@@ -21,3 +21,22 @@ export async function api(
     headers,
   });
 }
+
+// Fetch every page of a keyset-paginated list (e.g. /patients), following X-Next-Cursor.
+// Returns null if any page fails, like checking `res.ok` on a single call.
+export async function apiAll<T = any>(
+  path: string,
+  token?: string,
+  pageSize = 500
+): Promise<T[] | null> {
+  const sep = path.includes("?") ? "&" : "?";
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const res = await api(`${path}${sep}limit=${pageSize}${cursor ? `&after_id=${cursor}` : ""}`, {}, token);
+    if (!res.ok) return null;
+    items.push(...(await res.json()));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return items;
+}